@@ -4,13 +4,28 @@ from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 import os
 import re
+import sys
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
 import nltk
 from nltk.corpus import stopwords
-import gc
+import psutil
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-# Ensure resources are downloaded
-nltk.download('stopwords')
-stop_words = set(stopwords.words('english'))
+# Ensure resources are downloaded. This module is re-imported by every prep
+# worker process, so only hit the network when the corpus is missing.
+try:
+    stop_words = set(stopwords.words('english'))
+except LookupError:
+    nltk.download('stopwords')
+    stop_words = set(stopwords.words('english'))
 
 def clean_text(text):
     if not isinstance(text, str):
@@ -21,164 +36,427 @@ def clean_text(text):
     words = [w for w in words if w not in stop_words]
     return ' '.join(words)
 
-# Define paths relative to the script location
-script_dir = os.path.dirname(os.path.abspath(__file__))
-data_dir = os.path.join(script_dir, "../data")
-models_dir = os.path.join(script_dir, "saved_models")
+MEDICINE_NAME_COLS = ['Drug', 'Drug Name', 'drugName', 'Medicine', 'drug', 'Drug_Name', 'medicine', 'drug_name', 'name', 'Name']
+SIDE_EFFECT_COLS = ['Side Effects', 'SideEffects', 'sideEffects', 'side_effects', 'sideEffect', 'SideEffect']
+SUBSTITUTE_COLS = ['Substitute', 'substitute', 'Alternative', 'alternative', 'substitutes']
+EXCLUDE_COLS = ['Medicine Name', 'Excellent Review %', 'Average Review %', 'Poor Review %']
+TRAIN_ROW_LIMIT = 75000
+N_FEATURES = 1000
 
-# Ensure models directory exists
-if not os.path.exists(models_dir):
-    os.makedirs(models_dir)
+# Pipeline tuning (override with environment variables)
+MEMORY_BUDGET_MB = int(os.environ.get("TRAIN_MEMORY_BUDGET_MB", "2048"))
+PREP_WORKERS = int(os.environ.get("TRAIN_PREP_WORKERS", str(min(4, os.cpu_count() or 1))))
+PREFETCH_BATCHES = int(os.environ.get("TRAIN_PREFETCH_BATCHES", str(2 * PREP_WORKERS)))
+DEFAULT_BATCH_SIZE = 5000
+MIN_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 50000
+SCAN_CHUNK_SIZE = 50000
+# A batch is held as the raw chunk, a copy on its way to a worker process and
+# the worker's own copy plus joined text, so it costs a few times its size.
+BATCH_MEMORY_FACTOR = 3
 
-print("Loading datasets...")
-print(f"Looking for datasets in: {os.path.abspath(data_dir)}")
+def normalize_columns(df, side_effects=False):
+    """Strip column names and rename known aliases to the canonical names."""
+    df.columns = df.columns.str.strip()
+    aliases = [(MEDICINE_NAME_COLS, 'Medicine Name')]
+    if side_effects:
+        aliases += [(SIDE_EFFECT_COLS, 'Side Effects'), (SUBSTITUTE_COLS, 'Substitute')]
+    for candidates, target in aliases:
+        for col in candidates:
+            if col in df.columns:
+                df.rename(columns={col: target}, inplace=True)
+    return df
 
-if not os.path.exists(data_dir):
-    print(f"Error: Data directory not found at {data_dir}. Please check the path.")
-    exit(1)
+def current_rss_mb():
+    """Current RSS of this process and its prep workers in MB."""
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return rss / (1024 * 1024)
 
-csv_files = []
-cleaned_file_path = os.path.join(data_dir, "cleaned_medicine_data.csv")
-remaining_file_path = os.path.join(data_dir, "remaining_data.csv")
+def peak_rss_mb():
+    """Peak RSS of this process in MB, including spikes inside partial_fit that sampling misses.
 
-for root, dirs, files in os.walk(data_dir):
-    for file in files:
-        if file.lower().endswith('.csv'):
-            full_path = os.path.join(root, file)
-            # Skip remaining_data.csv to keep it for later as requested
-            if os.path.abspath(full_path) == os.path.abspath(remaining_file_path):
-                continue
-            csv_files.append(full_path)
+    Returns None where the resource module is unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
 
-print(f"Found {len(csv_files)} CSV files.")
+def estimate_model_mb(n_classes, n_features=N_FEATURES):
+    """MultinomialNB keeps feature_count_ and feature_log_prob_ as n_classes x n_features float64."""
+    return 2 * n_classes * n_features * 8 / (1024 * 1024)
 
-# ---------------------------------------------------------
-# STEP 1: First Pass - Find all unique Medicine Names
-# ---------------------------------------------------------
-print("🔍 Pass 1: Scanning all files to find unique medicines...")
-all_classes = set()
-side_effects_map = {}
+def fit_bytes_per_row(n_classes):
+    """partial_fit binarizes the labels into a dense rows x n_classes matrix and copies it to float64."""
+    return 2 * n_classes * 8
 
-for file_path in csv_files:
-    try:
-        temp_df = pd.read_csv(file_path, low_memory=False)
-        temp_df.columns = temp_df.columns.str.strip() # Clean column names
-        
-        # Normalize target column name (Handle 'Drug', 'Drug Name', etc.)
-        for col in ['Drug', 'Drug Name', 'drugName', 'Medicine', 'drug', 'Drug_Name', 'medicine', 'drug_name', 'name', 'Name']:
-            if col in temp_df.columns:
-                temp_df.rename(columns={col: 'Medicine Name'}, inplace=True)
-        
-        # Normalize Side Effects column
-        for col in ['Side Effects', 'SideEffects', 'sideEffects', 'side_effects', 'sideEffect', 'SideEffect']:
-            if col in temp_df.columns:
-                temp_df.rename(columns={col: 'Side Effects'}, inplace=True)
-
-        # Normalize Substitute column
-        for col in ['Substitute', 'substitute', 'Alternative', 'alternative', 'substitutes']:
-            if col in temp_df.columns:
-                temp_df.rename(columns={col: 'Substitute'}, inplace=True)
-        
-        if 'Medicine Name' in temp_df.columns:
-            # Add unique medicines to the set
-            unique_meds = temp_df['Medicine Name'].dropna().unique()
-            all_classes.update(unique_meds)
-            
-            if 'Side Effects' in temp_df.columns:
-                # Create a mapping of Medicine Name -> Side Effects
-                temp_map = temp_df[['Medicine Name', 'Side Effects']].dropna().drop_duplicates(subset=['Medicine Name'])
-                side_effects_map.update(dict(zip(temp_map['Medicine Name'], temp_map['Side Effects'])))
-        
-        # Free memory immediately
-        del temp_df
-
-    except Exception as e:
-        print(f"Error scanning {os.path.basename(file_path)}: {e}")
-
-if not all_classes:
-    print("❌ No medicine data found in any file.")
-    exit(1)
-
-all_classes = sorted(list(all_classes))
-print(f"✅ Found {len(all_classes)} unique medicines to predict.")
-
-# ---------------------------------------------------------
-# STEP 2: Initialize Model for Incremental Learning
-# ---------------------------------------------------------
-# HashingVectorizer is stateless and works well for training file-by-file.
-# alternate_sign=False ensures non-negative values for Naive Bayes.
-# Reduced n_features to 1000 to prevent Out of Memory (OOM) errors given the large number of classes (225k+)
-vectorizer = HashingVectorizer(stop_words='english', alternate_sign=False, n_features=1000)
-model = MultinomialNB()
-
-# ---------------------------------------------------------
-# STEP 3: Second Pass - Train on each file sequentially
-# ---------------------------------------------------------
-print("\n🚀 Pass 2: Starting incremental training (one file at a time)...")
-
-for i, file_path in enumerate(csv_files):
-    print(f"[{i+1}/{len(csv_files)}] Training on {os.path.basename(file_path)}...")
-    
+class BatchSizer:
+    """Picks the chunk size from an estimate of the memory a batch uses.
+
+    The baseline is the RSS measured once the model is allocated. What is
+    left of the budget, minus the model-sized temporaries every partial_fit
+    call needs, has to hold the chunks in flight (prefetched or being
+    prepared, sized from the bytes per row read so far) plus the dense label
+    matrix partial_fit builds for the batch it is training on.
+
+    The budget is estimated, not enforced: RSS is never polled during
+    partial_fit, so nothing shrinks batches after the fact. Until the
+    baseline is known, and whenever the model leaves no headroom, batches
+    are kept at MIN_BATCH_SIZE since the label matrix grows with every row.
+    """
+
+    def __init__(self, budget_mb, batches_in_flight, n_classes):
+        self.budget_mb = budget_mb
+        self.batches_in_flight = batches_in_flight
+        self.fit_bytes_per_row = fit_bytes_per_row(n_classes)
+        # partial_fit recomputes feature_log_prob_ through temporaries the size of the model
+        self.fit_overhead_mb = estimate_model_mb(n_classes)
+        self.baseline_mb = None
+        self.bytes_per_row = None
+        self.headroom_mb = None
+        # Chunks prefetched before the baseline is measured must not be the worst spike
+        self.batch_size = MIN_BATCH_SIZE
+        self.peak_mb = current_rss_mb()
+        self._lock = threading.Lock()
+
+    def set_baseline(self):
+        """Record the RSS once the model has been allocated by the first partial_fit."""
+        rss = current_rss_mb()
+        with self._lock:
+            self.baseline_mb = rss
+            self.peak_mb = max(self.peak_mb, rss)
+            self.headroom_mb = self.budget_mb - rss - self.fit_overhead_mb
+            if self.headroom_mb <= 0:
+                print(f"⚠️ The model uses {rss:.0f} MB plus {self.fit_overhead_mb:.0f} MB per partial_fit call, "
+                      f"over the {self.budget_mb} MB budget; using the minimum batch of {MIN_BATCH_SIZE} rows.")
+            else:
+                print(f"   Model allocated: baseline {rss:.0f} MB, {self.headroom_mb:.0f} MB left for batches.")
+            self._resize()
+
+    def record_chunk(self, nbytes, rows):
+        """Update the bytes-per-row estimate from a chunk the reader produced."""
+        if rows == 0:
+            return
+        with self._lock:
+            per_row = nbytes / rows
+            if self.bytes_per_row is None:
+                self.bytes_per_row = per_row
+            else:
+                self.bytes_per_row = 0.8 * self.bytes_per_row + 0.2 * per_row
+            self._resize()
+
+    def observe(self):
+        """Track the sampled RSS between batches for the final report."""
+        rss = current_rss_mb()
+        with self._lock:
+            self.peak_mb = max(self.peak_mb, rss)
+
+    def next_size(self):
+        with self._lock:
+            return self.batch_size
+
+    def _resize(self):
+        if self.headroom_mb is None or not self.bytes_per_row:
+            return
+        per_row = self.bytes_per_row * BATCH_MEMORY_FACTOR * self.batches_in_flight + self.fit_bytes_per_row
+        rows = max(self.headroom_mb, 0) * 1024 * 1024 / per_row
+        self.batch_size = int(min(MAX_BATCH_SIZE, max(MIN_BATCH_SIZE, rows)))
+
+def prepare_batch(df_batch, feature_cols, vectorizer):
+    """Join the text columns of a chunk, clean them and hash them into features."""
+    text = df_batch.reindex(columns=feature_cols).fillna('').astype(str)
+    combined = text.agg(' '.join, axis=1) if feature_cols else pd.Series('', index=df_batch.index)
+    X_batch = vectorizer.transform(combined.map(clean_text))
+    return X_batch, df_batch['Medicine Name'].to_numpy()
+
+def read_stage(csv_files, file_feature_cols, vectorizer, remaining_path, sizer, executor, out_queue, stop_event, errors):
+    """Reader stage: stream every CSV in chunks and hand them to the prep workers.
+
+    Puts (file_index, file_name, future, note) on out_queue and None when done.
+    """
+    file_name = None
     try:
-        df = pd.read_csv(file_path, low_memory=False)
-        df.columns = df.columns.str.strip()
+        for i, file_path in enumerate(csv_files):
+            if stop_event.is_set():
+                break
+            file_name = os.path.basename(file_path)
+            if file_path not in file_feature_cols:
+                continue
+            print(f"   Reading {file_name}...")
+            _read_file(i, file_path, file_feature_cols[file_path], vectorizer, remaining_path,
+                       sizer, executor, out_queue, stop_event)
+    except BaseException as e:
+        # Files that failed in pass 1 are already skipped, so a failure here aborts the run
+        # rather than training part of a file
+        print(f"❌ Error reading {file_name}: {e}")
+        errors.append(e)
+    finally:
+        out_queue.put(None)
 
-        # Apply same column normalization
-        for col in ['Drug', 'Drug Name', 'drugName', 'Medicine', 'drug', 'Drug_Name', 'medicine', 'drug_name', 'name', 'Name']:
-            if col in df.columns:
-                df.rename(columns={col: 'Medicine Name'}, inplace=True)
-        
-        if 'Medicine Name' not in df.columns:
+def _read_file(file_index, file_path, feature_cols, vectorizer, remaining_path, sizer, executor, out_queue, stop_event):
+    file_name = os.path.basename(file_path)
+    # Check if we need to split (only for cleaned_medicine_data.csv)
+    row_limit = TRAIN_ROW_LIMIT if "cleaned_medicine_data.csv" in file_path else None
+
+    rows_used = 0
+    remaining_rows = 0
+    # Everything is read as str so column types cannot change from one chunk to the next
+    with pd.read_csv(file_path, dtype=str, iterator=True) as reader:
+        while not stop_event.is_set():
+            try:
+                chunk = reader.get_chunk(sizer.next_size())
+            except StopIteration:
+                break
+            normalize_columns(chunk)
+            if 'Medicine Name' not in chunk.columns:
+                return
+            chunk = chunk.dropna(subset=['Medicine Name'])
+            chunk['Medicine Name'] = chunk['Medicine Name'].astype(str)
+
+            if row_limit is not None:
+                keep = max(0, row_limit - rows_used)
+                overflow = chunk.iloc[keep:]
+                chunk = chunk.iloc[:keep]
+                if not overflow.empty:
+                    overflow.to_csv(remaining_path, index=False,
+                                    mode='a' if remaining_rows else 'w', header=not remaining_rows)
+                    remaining_rows += len(overflow)
+                del overflow
+
+            if chunk.empty:
+                continue
+            rows_used += len(chunk)
+            sizer.record_chunk(chunk.memory_usage(deep=True).sum(), len(chunk))
+            # Blocks when PREFETCH_BATCHES batches are already waiting, bounding memory
+            future = executor.submit(prepare_batch, chunk, feature_cols, vectorizer)
+            out_queue.put((file_index, file_name, future, None))
+            del chunk, future
+
+    if row_limit is not None:
+        note = f"⚠️ Applied {row_limit:,} row limit for training."
+        if remaining_rows:
+            note += f"\n💾 Saved {remaining_rows} remaining rows to {remaining_path} for later."
+        out_queue.put((file_index, file_name, None, note))
+
+def _text_columns(df, known):
+    """Columns the baseline whole-file read would parse as text: any non-numeric value."""
+    found = []
+    for col in df.columns:
+        if col in EXCLUDE_COLS or col in known or col in found:
+            continue
+        values = df[col].dropna()
+        if values.empty:
             continue
+        if pd.to_numeric(values, errors='coerce').isna().any():
+            found.append(col)
+    return found
+
+def main():
+    # Define paths relative to the script location
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(script_dir, "../data")
+    models_dir = os.path.join(script_dir, "saved_models")
+
+    # Ensure models directory exists
+    if not os.path.exists(models_dir):
+        os.makedirs(models_dir)
+
+    print("Loading datasets...")
+    print(f"Looking for datasets in: {os.path.abspath(data_dir)}")
+
+    if not os.path.exists(data_dir):
+        print(f"Error: Data directory not found at {data_dir}. Please check the path.")
+        sys.exit(1)
+
+    csv_files = []
+    remaining_file_path = os.path.join(data_dir, "remaining_data.csv")
+
+    for root, dirs, files in os.walk(data_dir):
+        for file in files:
+            if file.lower().endswith('.csv'):
+                full_path = os.path.join(root, file)
+                # Skip remaining_data.csv to keep it for later as requested
+                if os.path.abspath(full_path) == os.path.abspath(remaining_file_path):
+                    continue
+                csv_files.append(full_path)
+
+    print(f"Found {len(csv_files)} CSV files.")
+
+    # ---------------------------------------------------------
+    # STEP 1: First Pass - Find all unique Medicine Names
+    # ---------------------------------------------------------
+    print("🔍 Pass 1: Scanning all files to find unique medicines...")
+    all_classes = set()
+    side_effects_map = {}
+    # Text columns per file, found over the whole file rather than one chunk
+    file_feature_cols = {}
+
+    for file_path in csv_files:
+        try:
+            file_map = {}
+            feature_cols = []
+            # Scan in chunks so the first pass also stays within the memory budget
+            for temp_df in pd.read_csv(file_path, dtype=str, chunksize=SCAN_CHUNK_SIZE):
+                normalize_columns(temp_df)
+
+                if 'Medicine Name' not in temp_df.columns:
+                    break
+
+                # Pass 2 only renames the medicine column, so text columns are found before the other renames
+                feature_cols += _text_columns(temp_df, feature_cols)
+                normalize_columns(temp_df, side_effects=True)
+
+                # Add unique medicines to the set
+                names = temp_df['Medicine Name'].dropna().astype(str)
+                all_classes.update(names.unique())
+
+                if 'Side Effects' in temp_df.columns:
+                    # Create a mapping of Medicine Name -> Side Effects (first occurrence in the file wins)
+                    temp_map = pd.DataFrame({'Medicine Name': names, 'Side Effects': temp_df['Side Effects']})
+                    temp_map = temp_map.dropna().drop_duplicates(subset=['Medicine Name'])
+                    for name, effects in zip(temp_map['Medicine Name'], temp_map['Side Effects']):
+                        file_map.setdefault(name, effects)
+
+                # Free memory immediately
+                del temp_df
+            else:
+                file_feature_cols[file_path] = feature_cols
+
+            side_effects_map.update(file_map)
+            del file_map
+
+        except Exception as e:
+            print(f"Error scanning {os.path.basename(file_path)}: {e}")
+
+    if not all_classes:
+        print("❌ No medicine data found in any file.")
+        sys.exit(1)
+
+    all_classes = sorted(list(all_classes))
+    print(f"✅ Found {len(all_classes)} unique medicines to predict.")
+
+    # ---------------------------------------------------------
+    # STEP 2: Initialize Model for Incremental Learning
+    # ---------------------------------------------------------
+    # HashingVectorizer is stateless and works well for training file-by-file.
+    # alternate_sign=False ensures non-negative values for Naive Bayes.
+    # Reduced n_features to 1000 to prevent Out of Memory (OOM) errors given the large number of classes (225k+)
+    vectorizer = HashingVectorizer(stop_words='english', alternate_sign=False, n_features=N_FEATURES)
+    model = MultinomialNB()
+
+    model_mb = estimate_model_mb(len(all_classes))
+    start_mb = current_rss_mb()
+    # Smallest useful step on top of the model: partial_fit's temporaries and the label matrix for MIN_BATCH_SIZE rows
+    min_batch_mb = model_mb + MIN_BATCH_SIZE * fit_bytes_per_row(len(all_classes)) / (1024 * 1024)
+    if start_mb + model_mb + min_batch_mb > MEMORY_BUDGET_MB:
+        print(f"⚠️ The model needs about {model_mb:.0f} MB (plus {min_batch_mb:.0f} MB per partial_fit call) "
+              f"on top of {start_mb:.0f} MB already in use, "
+              f"more than the {MEMORY_BUDGET_MB} MB budget (TRAIN_MEMORY_BUDGET_MB). "
+              "Peak memory will exceed the budget whatever the batch size.")
+
+    # ---------------------------------------------------------
+    # STEP 3: Second Pass - Pipelined incremental training
+    # ---------------------------------------------------------
+    # A reader thread streams each CSV in chunks and prefetches ahead, a pool
+    # of worker processes (or one thread when there is a single worker)
+    # joins/cleans/hashes the chunks, and the main process runs partial_fit. The queue between them is bounded so at most
+    # PREFETCH_BATCHES batches are waiting at once. The chunk size is derived
+    # from the memory left over once the model is allocated.
+    print("\n🚀 Pass 2: Starting pipelined incremental training...")
+    print(f"   Memory budget: {MEMORY_BUDGET_MB} MB, {PREP_WORKERS} prep workers, prefetch {PREFETCH_BATCHES} batches")
+
+    sizer = BatchSizer(MEMORY_BUDGET_MB, batches_in_flight=PREFETCH_BATCHES + PREP_WORKERS + 2,
+                       n_classes=len(all_classes))
+    batch_queue = queue.Queue(maxsize=PREFETCH_BATCHES)
+    stop_event = threading.Event()
+    reader_errors = []
+
+    # partial_fit is given integer labels: label_binarize checks string labels against
+    # every class name on each call, which costs more than the fit itself for small batches.
+    # classes_ is set back to the names once training is done.
+    class_index = pd.Index(all_classes)
+    class_codes = np.arange(len(all_classes))
+
+    if PREP_WORKERS > 1:
+        # spawn gives the same worker behaviour on Linux and macOS and avoids forking a threaded process
+        executor = ProcessPoolExecutor(max_workers=PREP_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        # A single worker process only adds interpreter and pickling overhead
+        executor = ThreadPoolExecutor(max_workers=1)
+    with executor:
+        reader = threading.Thread(
+            target=read_stage,
+            args=(csv_files, file_feature_cols, vectorizer, remaining_file_path,
+                  sizer, executor, batch_queue, stop_event, reader_errors),
+            daemon=True,
+        )
+        reader.start()
+
+        current_file = None
+        try:
+            while True:
+                item = batch_queue.get()
+                if item is None:
+                    break
+                file_index, file_name, future, note = item
+                if file_index != current_file:
+                    current_file = file_index
+                    print(f"[{file_index+1}/{len(csv_files)}] Training on {file_name}...")
+                if note:
+                    print(note)
+                if future is None:
+                    continue
+                try:
+                    X_batch, y_batch = future.result()
+                    y_codes = class_index.get_indexer(y_batch)
+                    if (y_codes < 0).any():
+                        raise ValueError(f"labels missing from pass 1: {set(y_batch[y_codes < 0])}")
+                    model.partial_fit(X_batch, y_codes, classes=class_codes)
+                    del X_batch, y_batch, y_codes
+                except Exception as e:
+                    # A dead worker pool or a failed batch would leave a partly trained model, so abort
+                    print(f"❌ Error training on {file_name}: {e}")
+                    raise
+                del future
+                if sizer.baseline_mb is None and hasattr(model, 'feature_count_'):
+                    sizer.set_baseline()
+                sizer.observe()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            stop_event.set()
+            # Drain the queue so a reader blocked on a full queue can exit
+            while reader.is_alive():
+                try:
+                    batch_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            reader.join()
+
+    if reader_errors:
+        raise reader_errors[0]
+
+    model.classes_ = np.asarray(all_classes)
+
+    # Save Models
+    print(f"Saving models to {models_dir}...")
+    pickle.dump(model, open(f"{models_dir}/drug_model.pkl", "wb"))
+    pickle.dump(vectorizer, open(f"{models_dir}/tfidf_vectorizer.pkl", "wb"))
+    pickle.dump(side_effects_map, open(f"{models_dir}/side_effects_map.pkl", "wb"))
+
+    peak = peak_rss_mb()
+    peak_note = f"{peak:.0f} MB in the training process, " if peak is not None else ""
+    print(f"   Peak RSS: {peak_note}{sizer.peak_mb:.0f} MB sampled across it and the prep workers "
+          f"(final batch size {sizer.batch_size} rows)")
+    print("✅ Models regenerated successfully!")
 
-        df = df.dropna(subset=['Medicine Name'])
-
-        # Check if we need to split (only for cleaned_medicine_data.csv)
-        if "cleaned_medicine_data.csv" in file_path:
-            print("⚠️ Applying 75,000 row limit for training...")
-            remaining_df = df.iloc[75000:]
-            df = df.iloc[:75000]
-            
-            if not remaining_df.empty:
-                remaining_path = os.path.join(data_dir, "remaining_data.csv")
-                remaining_df.to_csv(remaining_path, index=False)
-                print(f"💾 Saved {len(remaining_df)} remaining rows to {remaining_path} for later.")
-        
-        # Prepare Features
-        exclude_cols = ['Medicine Name', 'Excellent Review %', 'Average Review %', 'Poor Review %']
-        feature_cols = [col for col in df.columns if col not in exclude_cols and df[col].dtype == 'object']
-        
-        df[feature_cols] = df[feature_cols].fillna('')
-
-        # Process in batches to save memory
-        batch_size = 5000
-        print(f"   Processing in batches of {batch_size} rows...")
-
-        for start in range(0, len(df), batch_size):
-            end = min(start + batch_size, len(df))
-            df_batch = df.iloc[start:end].copy()
-
-            df_batch['combined_text'] = df_batch[feature_cols].apply(lambda row: ' '.join(row.values.astype(str)), axis=1)
-            df_batch['clean_text'] = df_batch['combined_text'].apply(clean_text)
-
-            X_batch = vectorizer.transform(df_batch['clean_text'])
-            y_batch = df_batch['Medicine Name']
-            
-            model.partial_fit(X_batch, y_batch, classes=all_classes)
-            
-            del df_batch, X_batch, y_batch
-            gc.collect()
-
-        del df
-        gc.collect()
-
-    except Exception as e:
-        print(f"⚠️ Error training on {os.path.basename(file_path)}: {e}")
-
-# Save Models
-print(f"Saving models to {models_dir}...")
-pickle.dump(model, open(f"{models_dir}/drug_model.pkl", "wb"))
-pickle.dump(vectorizer, open(f"{models_dir}/tfidf_vectorizer.pkl", "wb"))
-pickle.dump(side_effects_map, open(f"{models_dir}/side_effects_map.pkl", "wb"))
-
-print("✅ Models regenerated successfully!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()